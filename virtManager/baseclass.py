@@ -56,6 +56,9 @@ class vmmGObject(GObject.GObject):
         self._signal_id_map = {}
         self._next_signal_id = 1
 
+        self.__pending_signals = []
+        self.__pending_signals_lock = threading.Lock()
+
         self.object_key = str(self)
 
         # Config might not be available if we error early in startup
@@ -273,6 +276,28 @@ class vmmGObject(GObject.GObject):
 
         self.idle_add(emitwrap, signal, *args)
 
+    def idle_emit_batched(self, signal):
+        """
+        Like idle_emit, but coalesce with any other signals still pending
+        for this object, so they are all emitted in order from a single
+        idle callback. A signal that is already pending isn't queued twice.
+        """
+        with self.__pending_signals_lock:
+            if signal in self.__pending_signals:
+                return
+            self.__pending_signals.append(signal)
+            if len(self.__pending_signals) > 1:
+                return
+        self.idle_add(self.__emit_pending_signals)
+
+    def __emit_pending_signals(self):
+        with self.__pending_signals_lock:
+            signals = self.__pending_signals
+            self.__pending_signals = []
+        for signal in signals:
+            self.emit(signal)
+        return False
+
 
 class vmmGObjectUI(vmmGObject):
     def __init__(self, filename, windowname, builder=None, topwin=None):
@@ -23,6 +23,9 @@ from .object.domain import vmmDomain
 from .object.network import vmmNetwork
 from .object.nodedev import vmmNodeDevice
 from .object.storagepool import vmmStoragePool
+from .lib.statsmanager import build_stats_vector
+from .lib.statsmanager import calculate_cpu_percent
+from .lib.statsmanager import new_stats_history
 from .lib.statsmanager import vmmStatsManager
 
 
@@ -185,7 +188,8 @@ class vmmConnection(vmmGObject):
         self._objects = _ObjectList()
         self.statsmanager = vmmStatsManager()
 
-        self._stats = []
+        self._stats = new_stats_history(
+                self.config.get_stats_history_length())
         self._hostinfo = None
 
         self.add_gsettings_handle(
@@ -856,7 +860,8 @@ class vmmConnection(vmmGObject):
             self._storage_pool_cb_ids = []
             self._node_device_cb_ids = []
 
-        self._stats = []
+        self._stats = new_stats_history(
+                self.config.get_stats_history_length())
 
         if self._init_object_event:
             self._init_object_event.clear()  # pragma: no cover
@@ -1214,7 +1219,8 @@ class vmmConnection(vmmGObject):
         for obj in preexisting_objects:
             try:
                 if obj.reports_stats() and stats_update:
-                    pass
+                    if not force and not obj.stats_tick_is_due():
+                        continue
                 elif obj.is_domain() and not pollvm:
                     continue
                 elif obj.is_network() and not pollnet:
@@ -1253,11 +1259,6 @@ class vmmConnection(vmmGObject):
             return  # pragma: no cover
 
         now = time.time()
-        expected = self.config.get_stats_history_length()
-        current = len(self._stats)
-        if current > expected:
-            del self._stats[expected:current]  # pragma: no cover
-
         mem = 0
         cpuTime = 0
         rdRate = 0
@@ -1288,9 +1289,9 @@ class vmmConnection(vmmGObject):
             prevTimestamp = self._stats[0]["timestamp"]
             host_cpus = self.host_active_processor_count()
 
-            pcentHostCpu = ((cpuTime) * 100.0 /
-                            ((now - prevTimestamp) *
-                             1000.0 * 1000.0 * 1000.0 * host_cpus))
+            pcentHostCpu = (calculate_cpu_percent(cpuTime,
+                                                  now - prevTimestamp) /
+                            host_cpus)
 
         pcentHostCpu = max(0.0, min(100.0, pcentHostCpu))
         pcentMem = max(0.0, min(100.0, pcentMem))
@@ -1309,7 +1310,7 @@ class vmmConnection(vmmGObject):
             "netMaxRate": netMaxRate,
         }
 
-        self._stats.insert(0, newStats)
+        self._stats.appendleft(newStats)
 
 
     def schedule_priority_tick(self, **kwargs):
@@ -1334,18 +1335,8 @@ class vmmConnection(vmmGObject):
         return self._stats[0][record_name]
 
     def _vector_helper(self, record_name, limit, ceil=100.0):
-        vector = []
-        statslen = self.config.get_stats_history_length() + 1
-        if limit is not None:
-            statslen = min(statslen, limit)  # pragma: no cover
-
-        for i in range(statslen):
-            if i < len(self._stats):
-                vector.append(self._stats[i][record_name] / ceil)
-            else:
-                vector.append(0)
-
-        return vector
+        return build_stats_vector(self._stats, limit,
+                lambda stats: stats[record_name] / ceil)
 
     def stats_memory_vector(self, limit=None):
         return self._vector_helper("memoryPercent", limit)
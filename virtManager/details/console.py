@@ -878,10 +878,12 @@ class vmmConsolePages(vmmGObjectUI):
 
         target_port = dev.get_xml_idx()
         serial = None
+        page_idx = None
         name = src.get_label()
-        for s in self._serial_consoles:
+        for idx, s in enumerate(self._serial_consoles):
             if s.name == name:
                 serial = s
+                page_idx = idx
                 break
 
         if not serial:
@@ -891,10 +893,10 @@ class vmmConsolePages(vmmGObjectUI):
 
             title = Gtk.Label(label=name)
             self.widget("serial-pages").append_page(serial.get_box(), title)
+            page_idx = len(self._serial_consoles)
             self._serial_consoles.append(serial)
 
         serial.open_console()
-        page_idx = self._serial_consoles.index(serial)
         self.widget("console-pages").set_current_page(_CONSOLE_PAGE_SERIAL)
         self.widget("serial-pages").set_current_page(page_idx)
 
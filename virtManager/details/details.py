@@ -1783,11 +1783,11 @@ class vmmDetails(vmmGObjectUI):
 
         # Firmware
         domcaps = self.vm.get_domain_capabilities()
-        if self.vm.get_xmlobj().os.firmware == "efi":
+        guestos = self.vm.get_xmlobj().os
+        if guestos.firmware == "efi":
             firmware = 'UEFI'
         else:
-            firmware = domcaps.label_for_firmware_path(
-                self.vm.get_xmlobj().os.loader)
+            firmware = domcaps.label_for_firmware_path(guestos.loader)
         if self.widget("overview-firmware").is_visible():
             uiutil.set_list_selection(
                 self.widget("overview-firmware"), firmware)
@@ -1972,8 +1972,9 @@ class vmmDetails(vmmGObjectUI):
     def _refresh_config_memory(self):
         host_mem_widget = self.widget("state-host-memory")
         host_mem = self.vm.conn.host_memory_size() // 1024
-        vm_cur_mem = self.vm.xmlobj.currentMemory / 1024.0
-        vm_max_mem = self.vm.xmlobj.memory / 1024.0
+        xmlobj = self.vm.xmlobj
+        vm_cur_mem = xmlobj.currentMemory / 1024.0
+        vm_max_mem = xmlobj.memory / 1024.0
 
         host_mem_widget.set_text("%d MiB" % (int(round(host_mem))))
 
@@ -2205,8 +2206,8 @@ class vmmDetails(vmmGObjectUI):
         else:
             self.widget("video-3d").set_active(vid.accel3d)
 
-        if (self.vm.xmlobj.devices.graphics and
-            len(self.vm.xmlobj.devices.video) <= 1):
+        devices = self.vm.xmlobj.devices
+        if devices.graphics and len(devices.video) <= 1:
             self._disable_device_remove(
                 _("Cannot remove last video device while "
                   "Graphics/Display is attached."))
@@ -2463,40 +2464,44 @@ class vmmDetails(vmmGObjectUI):
             hw_list_model.insert(insertAt, hw_entry)
 
 
-        consoles = self.vm.xmlobj.devices.console
-        serials = self.vm.xmlobj.devices.serial
+        # Work off a single xmlobj, so a tick invalidating the XML
+        # partway through can't trigger more fetches or give us a
+        # mix of old and new devices
+        devices = self.vm.xmlobj.devices
+        consoles = devices.console
+        serials = devices.serial
         if serials and consoles and self.vm.serial_is_console_dup(serials[0]):
             consoles.pop(0)
 
-        disks = self.vm.xmlobj.devices.disk
+        disks = devices.disk
         for dev, _disk_bus_index in _calculate_disk_bus_index(disks):
             update_hwlist(HW_LIST_TYPE_DISK, dev, _disk_bus_index)
-        for dev in self.vm.xmlobj.devices.interface:
+        for dev in devices.interface:
             update_hwlist(HW_LIST_TYPE_NIC, dev)
-        for dev in self.vm.xmlobj.devices.input:
+        for dev in devices.input:
             update_hwlist(HW_LIST_TYPE_INPUT, dev)
-        for dev in self.vm.xmlobj.devices.graphics:
+        for dev in devices.graphics:
             update_hwlist(HW_LIST_TYPE_GRAPHICS, dev)
-        for dev in self.vm.xmlobj.devices.sound:
+        for dev in devices.sound:
             update_hwlist(HW_LIST_TYPE_SOUND, dev)
         for dev in serials:
             update_hwlist(HW_LIST_TYPE_CHAR, dev)
-        for dev in self.vm.xmlobj.devices.parallel:
+        for dev in devices.parallel:
             update_hwlist(HW_LIST_TYPE_CHAR, dev)
         for dev in consoles:
             update_hwlist(HW_LIST_TYPE_CHAR, dev)
-        for dev in self.vm.xmlobj.devices.channel:
+        for dev in devices.channel:
             update_hwlist(HW_LIST_TYPE_CHAR, dev)
-        for dev in self.vm.xmlobj.devices.hostdev:
+        for dev in devices.hostdev:
             update_hwlist(HW_LIST_TYPE_HOSTDEV, dev)
-        for dev in self.vm.xmlobj.devices.redirdev:
+        for dev in devices.redirdev:
             update_hwlist(HW_LIST_TYPE_REDIRDEV, dev)
-        for dev in self.vm.xmlobj.devices.video:
+        for dev in devices.video:
             update_hwlist(HW_LIST_TYPE_VIDEO, dev)
-        for dev in self.vm.xmlobj.devices.watchdog:
+        for dev in devices.watchdog:
             update_hwlist(HW_LIST_TYPE_WATCHDOG, dev)
 
-        for dev in self.vm.xmlobj.devices.controller:
+        for dev in devices.controller:
             # skip USB2 ICH9 companion controllers
             if dev.model in ["ich9-uhci1", "ich9-uhci2", "ich9-uhci3"]:
                 continue
@@ -2509,17 +2514,17 @@ class vmmDetails(vmmGObjectUI):
 
             update_hwlist(HW_LIST_TYPE_CONTROLLER, dev)
 
-        for dev in self.vm.xmlobj.devices.filesystem:
+        for dev in devices.filesystem:
             update_hwlist(HW_LIST_TYPE_FILESYSTEM, dev)
-        for dev in self.vm.xmlobj.devices.smartcard:
+        for dev in devices.smartcard:
             update_hwlist(HW_LIST_TYPE_SMARTCARD, dev)
-        for dev in self.vm.xmlobj.devices.tpm:
+        for dev in devices.tpm:
             update_hwlist(HW_LIST_TYPE_TPM, dev)
-        for dev in self.vm.xmlobj.devices.rng:
+        for dev in devices.rng:
             update_hwlist(HW_LIST_TYPE_RNG, dev)
-        for dev in self.vm.xmlobj.devices.panic:
+        for dev in devices.panic:
             update_hwlist(HW_LIST_TYPE_PANIC, dev)
-        for dev in self.vm.xmlobj.devices.vsock:
+        for dev in devices.vsock:
             update_hwlist(HW_LIST_TYPE_VSOCK, dev)
 
         devs = list(range(len(hw_list_model)))
@@ -188,9 +188,10 @@ class vmmSerialConsole(vmmGObject):
 
     @staticmethod
     def get_serialcon_devices(vm):
-        serials = vm.xmlobj.devices.serial
-        consoles = vm.xmlobj.devices.console
-        if serials and vm.serial_is_console_dup(serials[0]):
+        devices = vm.xmlobj.devices
+        serials = devices.serial
+        consoles = devices.console
+        if serials and consoles and vm.serial_is_console_dup(serials[0]):
             consoles.pop(0)
         return serials + consoles
 
@@ -586,6 +586,7 @@ class vmmSnapshotPage(vmmGObjectUI):
         xmlobj = snap.get_xmlobj()
         origxml = xmlobj.get_xml()
         xmlobj.description = desc
+        snap.xmlobj_edited()
         newxml = xmlobj.get_xml()
 
         self.vm.log_redefine_xml_diff(snap, origxml, newxml)
@@ -21,9 +21,11 @@ class ConnectionInfo(object):
     Holds all the bits needed to make a connection to a graphical console
     """
     def __init__(self, conn, gdev):
+        listens = gdev.listens
+        gport = gdev.port
         self.gtype = gdev.type
-        self.gport = gdev.port and str(gdev.port) or None
-        self.gsocket = (gdev.listens and gdev.listens[0].socket) or gdev.socket
+        self.gport = gport and str(gport) or None
+        self.gsocket = (listens and listens[0].socket) or gdev.socket
         self.gaddr = gdev.listen or "127.0.0.1"
         self.gtlsport = gdev.tlsPort or None
         self.glistentype = gdev.get_first_listen_type()
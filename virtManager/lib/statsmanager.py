@@ -3,7 +3,8 @@
 # This work is licensed under the GNU GPLv2 or later.
 # See the COPYING file in the top-level directory.
 
-import re
+import collections
+import itertools
 import time
 
 import libvirt
@@ -13,10 +14,70 @@ from virtinst import log
 from ..baseclass import vmmGObject
 
 
+def _sum_allstats(allstats, devtype, *fields):
+    """
+    Sum up the per device values of @fields reported by
+    getAllDomainStats, ex. block.0.rd.bytes + block.1.rd.bytes + ...
+    libvirt reports the number of devices as <devtype>.count, so
+    we can look up every key directly.
+    """
+    count = allstats.get("%s.count" % devtype, 0)
+    ret = []
+    for field in fields:
+        ret.append(sum(allstats.get("%s.%d.%s" % (devtype, idx, field), 0)
+                       for idx in range(count)))
+    return ret
+
+
+def calculate_cpu_percent(cpuTime, timedelta):
+    """
+    Convert @cpuTime nanoseconds of CPU time used over @timedelta
+    seconds of wall clock into a percentage of a single CPU
+    """
+    return (cpuTime * 100.0) / (timedelta * 1000.0 * 1000.0 * 1000.0)
+
+
+def new_stats_history(length):
+    """
+    Return a deque for @length stats records plus the current one.
+    Newest record goes first, and the oldest falls off the end once
+    the history is full.
+    """
+    return collections.deque(maxlen=length + 1)
+
+
+def build_stats_vector(history, limit, getvalue):
+    """
+    Build a graph vector of getvalue(record) for the newest @limit
+    records of the @history deque, padded out to a full history with 0
+
+    The tick thread appends to @history while the UI builds vectors,
+    and iterating a deque that is being mutated raises RuntimeError.
+    So first copy the records out with list(), which runs entirely in
+    C and can't be interrupted by the other thread.
+    """
+    statslen = history.maxlen
+    if limit is not None:
+        statslen = min(statslen, limit)
+
+    records = list(itertools.islice(history, statslen))
+    vector = [getvalue(record) for record in records]
+    vector.extend(itertools.repeat(0, statslen - len(vector)))
+    return vector
+
+
 class _VMStatsRecord(object):
     """
     Tracks a set of VM stats for a single timestamp
     """
+    # One of these is created per VM per tick, so skip the per
+    # instance __dict__
+    __slots__ = ["timestamp", "cpuTime", "cpuTimeAbs",
+                 "cpuHostPercent", "cpuGuestPercent",
+                 "curmem", "currMemPercent",
+                 "diskRdKiB", "diskWrKiB", "netRxKiB", "netTxKiB",
+                 "diskRdRate", "diskWrRate", "netRxRate", "netTxRate"]
+
     def __init__(self, timestamp,
                  cpuTime, cpuTimeAbs,
                  cpuHostPercent, cpuGuestPercent,
@@ -48,7 +109,10 @@ class _VMStatsList(vmmGObject):
     """
     def __init__(self):
         vmmGObject.__init__(self)
-        self._stats = []
+        self._stats = new_stats_history(
+                self.config.get_stats_history_length())
+        # The newest record, which is what most accessors want
+        self._latest = None
 
         self.diskRdMaxRate = 10.0
         self.diskWrMaxRate = 10.0
@@ -59,24 +123,25 @@ class _VMStatsList(vmmGObject):
         self.stats_disk_skip = []
         self.stats_net_skip = []
 
+        # get_vector results, reset whenever a new record comes in
+        self._vector_cache = {}
+
     def _cleanup(self):
         pass
 
     def append_stats(self, newstats):
-        expected = self.config.get_stats_history_length()
-        current = len(self._stats)
-        if current > expected:  # pragma: no cover
-            del(self._stats[expected:current])
+        oldstats = self._latest
+        rate_scale = 0.0
+        if oldstats:
+            # All rates share the same time delta, so only divide once
+            rate_scale = 1.0 / (newstats.timestamp - oldstats.timestamp)
 
         def _calculate_rate(record_name):
-            ret = 0.0
-            if self._stats:
-                oldstats = self._stats[0]
-                ratediff = (getattr(newstats, record_name) -
-                            getattr(oldstats, record_name))
-                timediff = newstats.timestamp - oldstats.timestamp
-                ret = float(ratediff) / float(timediff)
-            return max(ret, 0.0)
+            if not oldstats:
+                return 0.0
+            ratediff = (getattr(newstats, record_name) -
+                        getattr(oldstats, record_name))
+            return max(ratediff * rate_scale, 0.0)
 
         newstats.diskRdRate = _calculate_rate("diskRdKiB")
         newstats.diskWrRate = _calculate_rate("diskWrKiB")
@@ -88,30 +153,52 @@ class _VMStatsList(vmmGObject):
         self.netRxMaxRate = max(newstats.netRxRate, self.netRxMaxRate)
         self.netTxMaxRate = max(newstats.netTxRate, self.netTxMaxRate)
 
-        self._stats.insert(0, newstats)
+        self._stats.appendleft(newstats)
+        self._latest = newstats
+        self._vector_cache = {}
 
     def get_record(self, record_name):
-        if not self._stats:
+        if self._latest is None:
             return 0
-        return getattr(self._stats[0], record_name)
+        return getattr(self._latest, record_name)
+
+    def _get_cached_vector(self, key, buildfunc, *args):
+        # The graphs ask for the same vectors on every redraw, but the
+        # data only changes once per tick. Grab the dict up front, so a
+        # racing append_stats can't have us store a stale vector in
+        # the new cache. Callers must not modify the returned list.
+        cache = self._vector_cache
+        if key not in cache:
+            cache[key] = buildfunc(*args)
+        return cache[key]
+
+    def _build_vector(self, record_name, limit, ceil):
+        scale = 1.0 / ceil
+        return build_stats_vector(self._stats, limit,
+                lambda record: getattr(record, record_name) * scale)
+
+    def _build_avg_vector(self, name1, name2, limit, ceil):
+        scale = 0.5 / ceil
+        return build_stats_vector(self._stats, limit,
+                lambda record: ((getattr(record, name1) +
+                                 getattr(record, name2)) * scale))
 
     def get_vector(self, record_name, limit, ceil=100.0):
-        vector = []
-        statslen = self.config.get_stats_history_length() + 1
-        if limit is not None:
-            statslen = min(statslen, limit)
-
-        for i in range(statslen):
-            if i < len(self._stats):
-                vector.append(getattr(self._stats[i], record_name) / ceil)
-            else:
-                vector.append(0)
-        return vector
+        return self._get_cached_vector((record_name, limit, ceil),
+                self._build_vector, record_name, limit, ceil)
 
     def get_in_out_vector(self, name1, name2, limit, ceil):
         return (self.get_vector(name1, limit, ceil=ceil),
                 self.get_vector(name2, limit, ceil=ceil))
 
+    def get_avg_vector(self, name1, name2, limit, ceil):
+        """
+        Return the per sample average of name1 and name2, the combined
+        in/out graph shown in the manager
+        """
+        return self._get_cached_vector(("avg", name1, name2, limit, ceil),
+                self._build_avg_vector, name1, name2, limit, ceil)
+
 
 class vmmStatsManager(vmmGObject):
     """
@@ -123,10 +210,10 @@ class vmmStatsManager(vmmGObject):
         self._latest_all_stats = {}
 
         self._all_stats_supported = True
-        self._net_stats_supported = True
-        self._disk_stats_supported = True
         self._disk_stats_lxc_supported = True
         self._mem_stats_supported = True
+        self._net_sampler = self._sample_net_stats
+        self._disk_sampler = self._sample_disk_stats
 
 
     def _cleanup(self):
@@ -139,14 +226,15 @@ class vmmStatsManager(vmmGObject):
     # CPU stats handling #
     ######################
 
-    def _old_cpu_stats_helper(self, vm):
-        info = vm.get_backend().info()
+    def _old_cpu_stats_helper(self, vm, info):
+        if info is None:
+            info = vm.get_backend().info()
         state = info[0]
         guestcpus = info[3]
         cpuTimeAbs = info[4]
         return state, guestcpus, cpuTimeAbs
 
-    def _sample_cpu_stats(self, vm, allstats):
+    def _sample_cpu_stats(self, vm, allstats, info):
         timestamp = time.time()
         if (not vm.is_active() or
             not self.config.get_stats_enable_cpu_poll()):
@@ -164,7 +252,8 @@ class vmmStatsManager(vmmGObject):
             cpuTimeAbs = allstats.get("cpu.time", 0)
             timestamp = allstats.get("virt-manager.timestamp")
         else:
-            state, guestcpus, cpuTimeAbs = self._old_cpu_stats_helper(vm)
+            state, guestcpus, cpuTimeAbs = self._old_cpu_stats_helper(
+                    vm, info)
 
         is_offline = (state in [libvirt.VIR_DOMAIN_SHUTOFF,
                                 libvirt.VIR_DOMAIN_CRASHED])
@@ -176,9 +265,8 @@ class vmmStatsManager(vmmGObject):
         if not is_offline:
             hostcpus = vm.conn.host_active_processor_count()
 
-            pcentbase = (
-                    ((cpuTime) * 100.0) /
-                    ((timestamp - prevTimestamp) * 1000.0 * 1000.0 * 1000.0))
+            pcentbase = calculate_cpu_percent(cpuTime,
+                                              timestamp - prevTimestamp)
             cpuHostPercent = pcentbase / hostcpus
             # Under RHEL-5.9 using a XEN HV guestcpus can be 0 during shutdown
             # so play safe and check it.
@@ -205,7 +293,7 @@ class vmmStatsManager(vmmGObject):
         except libvirt.libvirtError as err:  # pragma: no cover
             if vm.conn.support.is_error_nosupport(err):
                 log.debug("conn does not support interfaceStats")
-                self._net_stats_supported = False
+                self._net_sampler = self._sample_net_stats_dummy
                 return 0, 0
 
             log.debug("Error in interfaceStats for '%s' dev '%s': %s",
@@ -218,22 +306,24 @@ class vmmStatsManager(vmmGObject):
 
         return 0, 0  # pragma: no cover
 
+    def _sample_net_stats_dummy(self, vm, allstats):  # pragma: no cover
+        # Becomes _net_sampler once the conn reports interfaceStats is
+        # unsupported, so the per tick path doesn't keep checking
+        ignore = allstats
+        self.get_vm_statslist(vm).stats_net_skip = []
+        return 0, 0
+
     def _sample_net_stats(self, vm, allstats):
         rx = 0
         tx = 0
         statslist = self.get_vm_statslist(vm)
-        if (not self._net_stats_supported or
-            not vm.is_active() or
+        if (not vm.is_active() or
             not self.config.get_stats_enable_net_poll()):
             statslist.stats_net_skip = []
             return rx, tx
 
         if allstats:
-            for key in allstats.keys():  # pragma: no cover
-                if re.match(r"net.[0-9]+.rx.bytes", key):
-                    rx += allstats[key]
-                if re.match(r"net.[0-9]+.tx.bytes", key):
-                    tx += allstats[key]
+            rx, tx = _sum_allstats(allstats, "net", "rx.bytes", "tx.bytes")
             return rx, tx
 
         for iface in vm.get_interface_devices_norefresh():
@@ -265,7 +355,7 @@ class vmmStatsManager(vmmGObject):
         except libvirt.libvirtError as err:  # pragma: no cover
             if vm.conn.support.is_error_nosupport(err):
                 log.debug("conn does not support blockStats")
-                self._disk_stats_supported = False
+                self._disk_sampler = self._sample_disk_stats_dummy
                 return 0, 0
 
             log.debug("Error in blockStats for '%s' dev '%s': %s",
@@ -278,22 +368,24 @@ class vmmStatsManager(vmmGObject):
 
         return 0, 0  # pragma: no cover
 
+    def _sample_disk_stats_dummy(self, vm, allstats):  # pragma: no cover
+        # Becomes _disk_sampler once the conn reports blockStats is
+        # unsupported, so the per tick path doesn't keep checking
+        ignore = allstats
+        self.get_vm_statslist(vm).stats_disk_skip = []
+        return 0, 0
+
     def _sample_disk_stats(self, vm, allstats):
         rd = 0
         wr = 0
         statslist = self.get_vm_statslist(vm)
-        if (not self._disk_stats_supported or
-            not vm.is_active() or
+        if (not vm.is_active() or
             not self.config.get_stats_enable_disk_poll()):
             statslist.stats_disk_skip = []
             return rd, wr
 
         if allstats:
-            for key in allstats.keys():
-                if re.match(r"block.[0-9]+.rd.bytes", key):
-                    rd += allstats[key]
-                if re.match(r"block.[0-9]+.wr.bytes", key):
-                    wr += allstats[key]
+            rd, wr = _sum_allstats(allstats, "block", "rd.bytes", "wr.bytes")
             return rd, wr
 
         # LXC has a special blockStats method
@@ -429,14 +521,18 @@ class vmmStatsManager(vmmGObject):
     # Public API #
     ##############
 
-    def refresh_vm_stats(self, vm):
+    def refresh_vm_stats(self, vm, info=None):
+        """
+        :param info: Optional virDomain.info() output, if the caller
+            already fetched it this tick. Saves a duplicate RPC.
+        """
         domallstats = self._latest_all_stats.get(vm.get_uuid(), None)
 
         (cpuTime, cpuTimeAbs, cpuHostPercent, cpuGuestPercent, timestamp) = \
-                self._sample_cpu_stats(vm, domallstats)
+                self._sample_cpu_stats(vm, domallstats, info)
         currMemPercent, curmem = self._sample_mem_stats(vm, domallstats)
-        diskRdBytes, diskWrBytes = self._sample_disk_stats(vm, domallstats)
-        netRxBytes, netTxBytes = self._sample_net_stats(vm, domallstats)
+        diskRdBytes, diskWrBytes = self._disk_sampler(vm, domallstats)
+        netRxBytes, netTxBytes = self._net_sampler(vm, domallstats)
 
         newstats = _VMStatsRecord(
                 timestamp, cpuTime, cpuTimeAbs,
@@ -1001,8 +1001,7 @@ class vmmManager(vmmGObjectUI):
         if obj is None or not hasattr(obj, "conn"):
             return
 
-        d1, d2 = obj.disk_io_vectors(GRAPH_LEN, self.max_disk_rate)
-        data = [(x + y) / 2 for x, y in zip(d1, d2)]
+        data = obj.disk_io_avg_vector(GRAPH_LEN, self.max_disk_rate)
         cell.set_property('data_array', data)
 
     def network_traffic_img(self, column_ignore, cell, model, _iter, data):
@@ -1010,6 +1009,5 @@ class vmmManager(vmmGObjectUI):
         if obj is None or not hasattr(obj, "conn"):
             return
 
-        d1, d2 = obj.network_traffic_vectors(GRAPH_LEN, self.max_net_rate)
-        data = [(x + y) / 2 for x, y in zip(d1, d2)]
+        data = obj.network_traffic_avg_vector(GRAPH_LEN, self.max_net_rate)
         cell.set_property('data_array', data)
@@ -4,6 +4,7 @@
 # This work is licensed under the GNU GPLv2 or later.
 # See the COPYING file in the top-level directory.
 
+import operator
 import os
 import time
 import threading
@@ -23,6 +24,23 @@ from ..lib.libvirtenummap import LibvirtEnumMap
 from ..lib import testmock
 
 
+# Shutoff VMs are ticked at most every 2**_TICK_BACKOFF_MAX stats ticks
+_TICK_BACKOFF_MAX = 3
+
+# Domain statuses that can be shut down or destroyed
+_STOPPABLE_STATUSES = frozenset([
+    libvirt.VIR_DOMAIN_RUNNING,
+    libvirt.VIR_DOMAIN_PAUSED,
+    libvirt.VIR_DOMAIN_CRASHED,
+    libvirt.VIR_DOMAIN_PMSUSPENDED,
+])
+# Snapshot states that captured the VM run state, not just disks
+_RUN_STATE_STATUSES = frozenset([
+    libvirt.VIR_DOMAIN_RUNNING,
+    libvirt.VIR_DOMAIN_PAUSED,
+])
+
+
 class _SENTINEL(object):
     pass
 
@@ -231,20 +249,20 @@ class vmmDomainSnapshot(vmmLibvirtObject):
         """
         Captured state is a running domain.
         """
-        return self._state_str_to_int() in [libvirt.VIR_DOMAIN_RUNNING]
+        return self._state_str_to_int() == libvirt.VIR_DOMAIN_RUNNING
     def has_run_state(self):
         """
         Captured state contains run state in addition to disk state.
         """
-        return self._state_str_to_int() in [libvirt.VIR_DOMAIN_RUNNING,
-                                            libvirt.VIR_DOMAIN_PAUSED]
+        return self._state_str_to_int() in _RUN_STATE_STATUSES
 
     def is_current(self):
         return self._backend.isCurrent()
     def is_external(self):
-        if self.get_xmlobj().memory_type == "external":
+        xmlobj = self.get_xmlobj()
+        if xmlobj.memory_type == "external":
             return True
-        for disk in self.get_xmlobj().disks:
+        for disk in xmlobj.disks:
             if disk.snapshot == "external":
                 return True
         return False
@@ -359,6 +377,9 @@ class vmmDomain(vmmLibvirtObject):
         self._domain_caps = None
         self._status_reason = None
         self._ipfetcher = _IPFetcher()
+        self._xmlobj_cache = (None, {})
+        self._shutoff_ticks = 0
+        self._skip_ticks = 0
 
         self.managedsave_supported = False
         self._domain_state_supported = False
@@ -372,6 +393,7 @@ class vmmDomain(vmmLibvirtObject):
         self._snapshot_list = None
         self._set_time_thread.cleanup()
         self._set_time_thread = None
+        self._xmlobj_cache = (None, {})
         vmmLibvirtObject._cleanup(self)
 
     def _init_libvirt_state(self):
@@ -435,10 +457,11 @@ class vmmDomain(vmmLibvirtObject):
         return False
 
     def has_nvram(self):
-        return bool(self.get_xmlobj().os.firmware == 'efi' or
-                    (self.get_xmlobj().os.loader_ro is True and
-                     self.get_xmlobj().os.loader_type == "pflash" and
-                     self.get_xmlobj().os.nvram))
+        guestos = self.get_xmlobj().os
+        return bool(guestos.firmware == 'efi' or
+                    (guestos.loader_ro is True and
+                     guestos.loader_type == "pflash" and
+                     guestos.nvram))
 
     def is_persistent(self):
         return bool(self._backend.isPersistent())
@@ -488,12 +511,25 @@ class vmmDomain(vmmLibvirtObject):
 
     def _invalidate_xml(self):
         vmmLibvirtObject._invalidate_xml(self)
-        self._id = None
         self._status_reason = None
         self._has_managed_save = None
 
+    def _refresh_status(self, *args, **kwargs):
+        # The domain ID only changes when the VM starts or stops, so
+        # with events, only drop it when the status changes rather
+        # than after every XML refresh. tick() handles polling
+        ret = vmmLibvirtObject._refresh_status(self, *args, **kwargs)
+        if ret:
+            self._id = None
+            self._shutoff_ticks = 0
+            self._skip_ticks = 0
+        return ret
+
     def _lookup_device_to_define(self, xmlobj, origdev, for_hotplug):
         if for_hotplug:
+            # The caller is going to edit the device from our cached
+            # xmlobj in place
+            self.xmlobj_edited()
             return origdev
 
         dev = xmlobj.find_device(origdev)
@@ -585,9 +621,7 @@ class vmmDomain(vmmLibvirtObject):
         """
         # If serial and duplicate console are both present, they both need
         # to be removed at the same time
-        con = None
-        if self.serial_is_console_dup(devobj):
-            con = self.xmlobj.devices.console[0]
+        con = self.serial_is_console_dup(devobj)
 
         xmlobj = self._make_xmlobj_to_define()
         editdev = self._lookup_device_to_define(xmlobj, devobj, False)
@@ -1017,11 +1051,11 @@ class vmmDomain(vmmLibvirtObject):
         if not self.is_active():
             return
 
-        def _hotplug_memory(val):
-            if val != self.xmlobj.currentMemory:
+        def _hotplug_memory(val, origval):
+            if val != origval:
                 self._backend.setMemory(val)
-        def _hotplug_maxmem(val):
-            if val != self.xmlobj.memory:
+        def _hotplug_maxmem(val, origval):
+            if val != origval:
                 self._backend.setMaxMemory(val)
 
         def _hotplug_metadata(val, mtype):
@@ -1033,14 +1067,18 @@ class vmmDomain(vmmLibvirtObject):
             log.debug("Hotplugging curmem=%s maxmem=%s for VM '%s'",
                          memory, maxmem, self.get_name())
 
-            actual_cur = self.xmlobj.currentMemory
+            # Every xmlobj access can mean an XML refresh when polling,
+            # so read both values from a single copy up front
+            xmlobj = self.get_xmlobj()
+            actual_cur = xmlobj.currentMemory
+            actual_max = xmlobj.memory
             if maxmem < actual_cur:
                 # Set current first to avoid error
-                _hotplug_memory(memory)
-                _hotplug_maxmem(maxmem)
+                _hotplug_memory(memory, actual_cur)
+                _hotplug_maxmem(maxmem, actual_max)
             else:
-                _hotplug_maxmem(maxmem)
-                _hotplug_memory(memory)
+                _hotplug_maxmem(maxmem, actual_max)
+                _hotplug_memory(memory, actual_cur)
 
         if description != _SENTINEL:
             _hotplug_metadata(description,
@@ -1235,9 +1273,9 @@ class vmmDomain(vmmLibvirtObject):
         return self.get_xmlobj().os.arch
     def get_init(self):
         import pipes
-        init = self.get_xmlobj().os.init
-        initargs = " ".join(
-            [pipes.quote(i.val) for i in self.get_xmlobj().os.initargs])
+        guestos = self.get_xmlobj().os
+        init = guestos.init
+        initargs = " ".join([pipes.quote(i.val) for i in guestos.initargs])
         return init, initargs
 
     def get_emulator(self):
@@ -1251,10 +1289,27 @@ class vmmDomain(vmmLibvirtObject):
             return title
         return self.get_name()
 
+    def _get_xmlobj_value(self, xmlobj, attrpath):
+        """
+        Return the value at @attrpath, like 'devices.disk', of @xmlobj.
+        The stats tick and the manager's row updates read the same few
+        values for every VM over and over, so results are cached until
+        a different xmlobj is passed in, i.e. the XML was reparsed.
+        """
+        # Owner and cache are swapped as one tuple, so the tick thread
+        # and the main thread can't mix up values of different xmlobjs
+        owner, cache = self._xmlobj_cache
+        if owner is not xmlobj:
+            cache = {}
+            self._xmlobj_cache = (xmlobj, cache)
+        if attrpath not in cache:
+            cache[attrpath] = operator.attrgetter(attrpath)(xmlobj)
+        return cache[attrpath]
+
     def get_title(self):
-        return self.get_xmlobj().title
+        return self._get_xmlobj_value(self.get_xmlobj(), "title")
     def get_description(self):
-        return self.get_xmlobj().description
+        return self._get_xmlobj_value(self.get_xmlobj(), "description")
 
     def get_boot_order(self):
         legacy = not self.can_use_device_boot_order()
@@ -1269,11 +1324,11 @@ class vmmDomain(vmmLibvirtObject):
                 guest.os.dtb, guest.os.kernel_args)
 
     def get_interface_devices_norefresh(self):
-        xmlobj = self.get_xmlobj(refresh_if_nec=False)
-        return xmlobj.devices.interface
+        return self._get_xmlobj_value(
+                self.get_xmlobj(refresh_if_nec=False), "devices.interface")
     def get_disk_devices_norefresh(self):
-        xmlobj = self.get_xmlobj(refresh_if_nec=False)
-        return xmlobj.devices.disk
+        return self._get_xmlobj_value(
+                self.get_xmlobj(refresh_if_nec=False), "devices.disk")
 
     def serial_is_console_dup(self, serial):
         return DeviceConsole.get_console_duplicate(self.xmlobj, serial)
@@ -1497,6 +1552,16 @@ class vmmDomain(vmmLibvirtObject):
             ceil = self.disk_io_max_rate()
         return self._get_stats().get_in_out_vector(
                 "diskRdRate", "diskWrRate", limit, ceil)
+    def network_traffic_avg_vector(self, limit=None, ceil=None):
+        if ceil is None:
+            ceil = self.network_traffic_max_rate()
+        return self._get_stats().get_avg_vector(
+                "netRxRate", "netTxRate", limit, ceil)
+    def disk_io_avg_vector(self, limit=None, ceil=None):
+        if ceil is None:
+            ceil = self.disk_io_max_rate()
+        return self._get_stats().get_avg_vector(
+                "diskRdRate", "diskWrRate", limit, ceil)
 
 
     ###################
@@ -1517,23 +1582,20 @@ class vmmDomain(vmmLibvirtObject):
     def is_crashed(self):
         return self.status() == libvirt.VIR_DOMAIN_CRASHED
     def is_stoppable(self):
-        return self.status() in [libvirt.VIR_DOMAIN_RUNNING,
-                                 libvirt.VIR_DOMAIN_PAUSED,
-                                 libvirt.VIR_DOMAIN_CRASHED,
-                                 libvirt.VIR_DOMAIN_PMSUSPENDED]
+        return self.status() in _STOPPABLE_STATUSES
     def is_destroyable(self):
-        return (self.is_stoppable() or
-                self.status() in [libvirt.VIR_DOMAIN_CRASHED])
+        # Crashed VMs are already covered by is_stoppable
+        return self.is_stoppable()
     def is_runable(self):
         return self.is_shutoff()
     def is_pauseable(self):
-        return self.status() in [libvirt.VIR_DOMAIN_RUNNING]
+        return self.status() == libvirt.VIR_DOMAIN_RUNNING
     def is_unpauseable(self):
-        return self.status() in [libvirt.VIR_DOMAIN_PAUSED]
+        return self.status() == libvirt.VIR_DOMAIN_PAUSED
     def is_paused(self):
-        return self.status() in [libvirt.VIR_DOMAIN_PAUSED]
+        return self.status() == libvirt.VIR_DOMAIN_PAUSED
     def is_cloneable(self):
-        return self.status() in [libvirt.VIR_DOMAIN_SHUTOFF]
+        return self.status() == libvirt.VIR_DOMAIN_SHUTOFF
 
     def run_status(self):
         return LibvirtEnumMap.pretty_run_status(
@@ -1617,26 +1679,66 @@ class vmmDomain(vmmLibvirtObject):
     # Polling helpers #
     ###################
 
+    def _update_tick_backoff(self, dosignal):
+        if not self._using_events():
+            # Without events, the stats tick is also what notices
+            # status and XML changes, so it must never be skipped
+            return
+
+        # Which stats are polled is configurable, so a running VM can't
+        # reliably be told apart from an idle one. Only shutoff VMs,
+        # which have nothing to sample, are backed off
+        if dosignal or self.is_active():
+            self._shutoff_ticks = 0
+            self._skip_ticks = 0
+            return
+
+        # Skipped ticks don't add a sample, so the graphs stop scrolling.
+        # Wait until the whole stats history is from after shutdown, so
+        # only flat graphs are held in place
+        self._shutoff_ticks += 1
+        backoff = self._shutoff_ticks - self.config.get_stats_history_length()
+        if backoff > 0:
+            self._skip_ticks = 2 ** min(backoff, _TICK_BACKOFF_MAX) - 1
+
+    def stats_tick_is_due(self):
+        """
+        Return False if the connection can skip this stats tick for
+        us. Only done with domain events, where the tick is just stats
+        sampling. The longer the VM has been shutoff, the more ticks are
+        skipped. Any status change event resets this.
+        """
+        if self._skip_ticks > 0:
+            self._skip_ticks -= 1
+            return False
+        return True
+
     def tick(self, stats_update=True):
         if (not self._using_events() and
             not stats_update):
             return
 
         dosignal = False
+        info = None
         if not self._using_events():
             # For domains it's pretty important that we are always using
             # the latest XML, but other objects probably don't want to do
             # this since it could be a performance hit.
             self._invalidate_xml()
+            # Polling can miss a VM being destroyed and restarted
+            # between ticks, which gives it a new ID without a status
+            # change. get_id() only refetches on demand, so this is cheap
+            self._id = None
             info = self._backend.info()
             dosignal = self._refresh_status(newstatus=info[0], cansignal=False)
 
         if stats_update:
-            self.conn.statsmanager.refresh_vm_stats(self)
+            self.conn.statsmanager.refresh_vm_stats(self, info)
+            self._update_tick_backoff(dosignal)
         if dosignal:
-            self.idle_emit("state-changed")
+            self.idle_emit_batched("state-changed")
         if stats_update:
-            self.idle_emit("resources-sampled")
+            self.idle_emit_batched("resources-sampled")
 
 
 ########################
@@ -4,6 +4,8 @@
 # This work is licensed under the GNU GPLv2 or later.
 # See the COPYING file in the top-level directory.
 
+import logging
+
 from virtinst import log
 from virtinst import xmlutil
 
@@ -30,6 +32,7 @@ class vmmLibvirtObject(vmmGObject):
         self.__status = None
 
         self._xmlobj = None
+        self._xmlobj_raw = None
         self._xmlobj_to_define = None
         self._is_xml_valid = False
 
@@ -39,6 +42,9 @@ class vmmLibvirtObject(vmmGObject):
 
     @staticmethod
     def log_redefine_xml_diff(obj, origxml, newxml):
+        if not log.isEnabledFor(logging.DEBUG):
+            # Don't bother generating a diff nobody will see
+            return  # pragma: no cover
         if origxml == newxml:
             log.debug("Redefine requested for %s, but XML didn't change!",
                           obj)
@@ -106,11 +112,12 @@ class vmmLibvirtObject(vmmGObject):
         self.ensure_latest_xml()
         xmlobj = self._make_xmlobj_to_define()
         if xmlobj.name == newname:
+            self._pop_xml_to_define(xmlobj)
             return  # pragma: no cover
 
         log.debug("Changing %s name from %s to %s",
                       self, oldname, newname)
-        origxml = xmlobj.get_xml()
+        origxml = self._pop_xml_to_define(xmlobj) or xmlobj.get_xml()
         xmlobj.name = newname
         newxml = xmlobj.get_xml()
 
@@ -276,14 +283,19 @@ class vmmLibvirtObject(vmmGObject):
         :param nosignal: If true, don't send state-changed. Used by
             callers that are going to send it anyways.
         """
-        origxml = None
-        if self._xmlobj:
-            origxml = self._xmlobj.get_xml()
+        # Compare raw libvirt output against raw libvirt output. The
+        # xmlobj's get_xml() is reserialized by libxml2, so it would
+        # never compare equal, and it's expensive to generate every tick
+        origxml = self._xmlobj_raw
 
         self._invalidate_xml()
         active_xml = self._XMLDesc(self._active_xml_flags)
-        self._xmlobj = self._parseclass(self.conn.get_backend(),
-            parsexml=active_xml)
+        if self._xmlobj is None or active_xml != origxml:
+            # Polling refreshes the XML every tick, but it rarely
+            # changes, so only reparse when libvirt hands us new content
+            self._xmlobj = self._parseclass(self.conn.get_backend(),
+                parsexml=active_xml)
+            self._xmlobj_raw = active_xml
         self._is_xml_valid = True
 
         if not nosignal and origxml != active_xml:
@@ -317,6 +329,15 @@ class vmmLibvirtObject(vmmGObject):
 
         return self._xmlobj
 
+    def xmlobj_edited(self):
+        """
+        Callers that edit the cached xmlobj from get_xmlobj in place
+        must call this. The next refresh then reparses even if libvirt's
+        XML didn't change, so edits that never made it to libvirt are
+        dropped instead of sticking around
+        """
+        self._xmlobj_raw = None
+
     @property
     def xmlobj(self):
         return self.get_xmlobj()
@@ -326,7 +347,8 @@ class vmmLibvirtObject(vmmGObject):
         Return the raw inactive XML we would use to alter/define an
         object. Used by the xmleditor UI
         """
-        return self._make_xmlobj_to_define().get_xml()
+        xmlobj = self._make_xmlobj_to_define()
+        return self._pop_xml_to_define(xmlobj) or xmlobj.get_xml()
 
     def define_xml(self, xml):
         """
@@ -358,7 +380,24 @@ class vmmLibvirtObject(vmmGObject):
 
         Most subclasses shouldn't touch this, but vmmDomainVirtinst needs to.
         """
-        return self.get_xmlobj(inactive=True)
+        xmlobj = self.get_xmlobj(inactive=True)
+        self._xmlobj_to_define = None
+        if log.isEnabledFor(logging.DEBUG):
+            # Remember the unaltered XML, so _redefine_xmlobj can log
+            # its diff without fetching and parsing the inactive XML again
+            self._xmlobj_to_define = (xmlobj, xmlobj.get_xml())
+        return xmlobj
+
+    def _pop_xml_to_define(self, xmlobj):
+        """
+        Return the unaltered XML stashed by _make_xmlobj_to_define for
+        @xmlobj, or None, and drop the stash
+        """
+        stash = self._xmlobj_to_define
+        self._xmlobj_to_define = None
+        if stash and stash[0] is xmlobj:
+            return stash[1]
+        return None
 
     def _redefine_xml_internal(self, origxml, newxml):
         self.log_redefine_xml_diff(self, origxml, newxml)
@@ -378,6 +417,9 @@ class vmmLibvirtObject(vmmGObject):
 
         Most subclasses shouldn't alter this, but vmmDomainVirtinst needs to.
         """
-        origxml = self._make_xmlobj_to_define().get_xml()
+        origxml = self._pop_xml_to_define(xmlobj)
+        if origxml is None and log.isEnabledFor(logging.DEBUG):
+            origxml = self.get_xmlobj(inactive=True).get_xml()
+
         newxml = xmlobj.get_xml()
         self._redefine_xml_internal(origxml, newxml)
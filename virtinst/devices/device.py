@@ -94,6 +94,35 @@ class DeviceAddress(XMLBuilder):
     base = XMLProperty("./@base")
 
 
+# Properties compare_device uses to match up devices, by DEVICE_TYPE
+_COMPARE_DEVICE_PROPS = {
+    "disk":          ["target", "bus"],
+    "interface":     ["macaddr", "xmlindex"],
+    "input":         ["bus", "type", "xmlindex"],
+    "sound":         ["model", "xmlindex"],
+    "video":         ["model", "xmlindex"],
+    "watchdog":      ["model", "xmlindex"],
+    "hostdev":       ["type", "managed", "xmlindex",
+                      "product", "vendor",
+                      "function", "domain", "slot"],
+    "serial":        ["type", "target_port"],
+    "parallel":      ["type", "target_port"],
+    "console":       ["type", "target_type", "target_port"],
+    "graphics":      ["type", "xmlindex"],
+    "controller":    ["type", "index"],
+    "channel":       ["type", "target_name"],
+    "filesystem":    ["target", "xmlindex"],
+    "smartcard":     ["mode", "xmlindex"],
+    "redirdev":      ["bus", "type", "xmlindex"],
+    "tpm":           ["type", "xmlindex"],
+    "rng":           ["backend_model", "xmlindex"],
+    "panic":         ["model", "xmlindex"],
+    "vsock":         ["model", "xmlindex"],
+    "memballoon":    ["model", "xmlindex"],
+    "iommu":         ["model", "xmlindex"],
+}
+
+
 class Device(XMLBuilder):
     """
     Base class for all domain xml device objects.
@@ -126,40 +155,13 @@ class Device(XMLBuilder):
         we have to do some fuzzy matching to determine if the devices
         are a 'match'
         """
-        devprops = {
-            "disk":          ["target", "bus"],
-            "interface":     ["macaddr", "xmlindex"],
-            "input":         ["bus", "type", "xmlindex"],
-            "sound":         ["model", "xmlindex"],
-            "video":         ["model", "xmlindex"],
-            "watchdog":      ["model", "xmlindex"],
-            "hostdev":       ["type", "managed", "xmlindex",
-                              "product", "vendor",
-                              "function", "domain", "slot"],
-            "serial":        ["type", "target_port"],
-            "parallel":      ["type", "target_port"],
-            "console":       ["type", "target_type", "target_port"],
-            "graphics":      ["type", "xmlindex"],
-            "controller":    ["type", "index"],
-            "channel":       ["type", "target_name"],
-            "filesystem":    ["target", "xmlindex"],
-            "smartcard":     ["mode", "xmlindex"],
-            "redirdev":      ["bus", "type", "xmlindex"],
-            "tpm":           ["type", "xmlindex"],
-            "rng":           ["backend_model", "xmlindex"],
-            "panic":         ["model", "xmlindex"],
-            "vsock":         ["model", "xmlindex"],
-            "memballoon":    ["model", "xmlindex"],
-            "iommu":         ["model", "xmlindex"],
-        }
-
         if id(self) == id(newdev):
             return True
 
         if not isinstance(self, type(newdev)):
             return False
 
-        if self.DEVICE_TYPE not in devprops:  # pragma: no cover
+        if self.DEVICE_TYPE not in _COMPARE_DEVICE_PROPS:  # pragma: no cover
             return False
 
         # Only compare against XML ID values, if both devices were
@@ -168,7 +170,7 @@ class Device(XMLBuilder):
         can_check_xml = ("devices" in newdev.get_xml_id() and
                 "devices" in self.get_xml_id())
 
-        for devprop in devprops[self.DEVICE_TYPE]:
+        for devprop in _COMPARE_DEVICE_PROPS[self.DEVICE_TYPE]:
             if devprop == "xmlindex":
                 if not can_check_xml:
                     continue
@@ -98,8 +98,9 @@ class DeviceGraphics(Device):
             self.remove_child(listen)
 
     def get_first_listen_type(self):
-        if len(self.listens) > 0:
-            return self.listens[0].type
+        listens = self.listens
+        if listens:
+            return listens[0].type
         return None
 
     def _set_listen_none(self):
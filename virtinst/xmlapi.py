@@ -4,6 +4,8 @@
 # This work is licensed under the GNU GPLv2 or later.
 # See the COPYING file in the top-level directory.
 
+import functools
+
 import libxml2
 
 from . import xmlutil
@@ -82,6 +84,17 @@ class _XPath(object):
         return self.join(self.segments[:-1])
 
 
+@functools.lru_cache(maxsize=4096)
+def _get_xpath(fullxpath):
+    """
+    Return a cached _XPath for the passed string. Every XMLProperty
+    get/set splits its xpath into segments, and the same handful of
+    xpaths are used over and over, so only do that work once.
+    _XPath instances must be treated as read-only.
+    """
+    return _XPath(fullxpath)
+
+
 class _XMLBase(object):
     NAMESPACES = {}
     @classmethod
@@ -135,7 +148,7 @@ class _XMLBase(object):
             return None
         if is_bool:
             return True
-        xpathobj = _XPath(xpath)
+        xpathobj = _get_xpath(xpath)
         if xpathobj.is_prop:
             return self._node_get_property(node, xpathobj.propname)
         return self._node_get_text(node)
@@ -176,7 +189,7 @@ class _XMLBase(object):
         of whether it has children or not, and then clean up the XML
         chain
         """
-        xpathobj = _XPath(fullxpath)
+        xpathobj = _get_xpath(fullxpath)
         parentnode = self._find(xpathobj.parent_xpath())
         childnode = self._find(fullxpath)
         if parentnode is None or childnode is None:
@@ -193,7 +206,7 @@ class _XMLBase(object):
             {"expectname": expected_root_name, "foundname": rootname})
 
     def _node_set_content(self, xpath, node, setval):
-        xpathobj = _XPath(xpath)
+        xpathobj = _get_xpath(xpath)
         if setval is not None:
             setval = str(setval)
         if xpathobj.is_prop:
@@ -223,7 +236,7 @@ class _XMLBase(object):
         Even if <bar> didn't exist before. So we fill in the dependent property
         expression values
         """
-        xpathobj = _XPath(fullxpath)
+        xpathobj = _get_xpath(fullxpath)
         parentxpath = "."
         parentnode = self._find(parentxpath)
         if not parentnode:
@@ -257,7 +270,7 @@ class _XMLBase(object):
         if it doesn't have any children or attributes, so we don't
         leave stale elements in the XML
         """
-        xpathobj = _XPath(fullxpath)
+        xpathobj = _get_xpath(fullxpath)
         segments = xpathobj.segments[:]
         parent = None
         while segments:
@@ -280,16 +293,18 @@ def node_is_text(n):
 
 
 class _Libxml2API(_XMLBase):
-    def __init__(self, xml):
+    def __init__(self, xml, doc=None):
         _XMLBase.__init__(self)
 
-        # Use of gtksourceview in virt-manager changes this libxml
-        # global setting which messes up whitespace after parsing.
-        # We can probably get away with calling this less but it
-        # would take some investigation
-        libxml2.keepBlanksDefault(1)
+        if doc is None:
+            # Use of gtksourceview in virt-manager changes this libxml
+            # global setting which messes up whitespace after parsing.
+            # We can probably get away with calling this less but it
+            # would take some investigation
+            libxml2.keepBlanksDefault(1)
+            doc = libxml2.parseDoc(xml)
 
-        self._doc = libxml2.parseDoc(xml)
+        self._doc = doc
         self._ctx = self._doc.xpathNewContext()
         self._ctx.setContextNode(self._doc.children)
         for key, val in self.NAMESPACES.items():
@@ -310,10 +325,12 @@ class _Libxml2API(_XMLBase):
         return xml
 
     def copy_api(self):
-        return _Libxml2API(self._doc.children.serialize())
+        # Copy the tree directly, rather than serializing the
+        # document and parsing it all over again
+        return _Libxml2API(None, doc=self._doc.copyDoc(1))
 
     def _find(self, fullxpath):
-        xpath = _XPath(fullxpath).xpath
+        xpath = _get_xpath(fullxpath).xpath
         try:
             node = self._ctx.xpathEval(xpath)
         except Exception as e:
@@ -328,7 +345,13 @@ class _Libxml2API(_XMLBase):
     def _node_tostring(self, node):
         return node.serialize()
     def _node_from_xml(self, xml):
-        return libxml2.parseDoc(xml).children
+        # Copy the node into our own document, so the temporary parsed
+        # document can be freed rather than leaked along with the node
+        doc = libxml2.parseDoc(xml)
+        try:
+            return doc.children.docCopyNode(self._doc, 1)
+        finally:
+            doc.freeDoc()
 
     def _node_get_text(self, node):
         return node.content
@@ -395,7 +418,7 @@ class _Libxml2API(_XMLBase):
 
         node.unlinkNode()
         node.freeNode()
-        if all([node_is_text(n) for n in parentnode.children]):
+        if all(node_is_text(n) for n in parentnode.children):
             parentnode.setContent(None)
 
     def _node_add_child(self, parentxpath, parentnode, newnode):
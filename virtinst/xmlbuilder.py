@@ -96,11 +96,9 @@ class _XMLChildList(list):
     which instantiates and appends a new child object
     """
     def __init__(self, childclass, copylist, xmlbuilder):
-        list.__init__(self)
+        list.__init__(self, copylist)
         self._childclass = childclass
         self._xmlbuilder = xmlbuilder
-        for i in copylist:
-            self.append(i)
 
     def new(self):
         """
@@ -401,6 +399,10 @@ class _XMLState(object):
         self._parent_xpath = (
             parentxmlstate and parentxmlstate.abs_xpath()) or ""
 
+        # make_abs_xpath results, since every XMLProperty read and
+        # write goes through it. Reset whenever our position changes
+        self._abs_xpath_cache = {}
+
         self.xmlapi = None
         self.is_build = not parsexml and not parentxmlstate
         self.parse(parsexml, parentxmlstate)
@@ -430,9 +432,11 @@ class _XMLState(object):
 
     def set_relative_object_xpath(self, xpath):
         self._relative_object_xpath = xpath or ""
+        self._abs_xpath_cache = {}
 
     def set_parent_xpath(self, xpath):
         self._parent_xpath = xpath or ""
+        self._abs_xpath_cache = {}
 
     def _join_xpath(self, x1, x2):
         if x2.startswith("."):
@@ -451,7 +455,11 @@ class _XMLState(object):
         to an absolute xpath like:
             ./devices/disk[3]/driver/@name
         """
-        return self._join_xpath(self.abs_xpath() or ".", xpath)
+        ret = self._abs_xpath_cache.get(xpath)
+        if ret is None:
+            ret = self._join_xpath(self.abs_xpath() or ".", xpath)
+            self._abs_xpath_cache[xpath] = ret
+        return ret
 
 
 class XMLBuilder(object):
@@ -546,7 +554,7 @@ class XMLBuilder(object):
     def _initial_child_parse(self):
         # Walk the XML tree and hand of parsing to any registered
         # child classes
-        for xmlprop in list(self._all_child_props().values()):
+        for xmlprop in self._all_child_props().values():
             child_class = xmlprop.child_class
             prop_path = xmlprop.get_prop_xpath(self, child_class)
 